@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+import math
+
+from probe_common import configure_logging, run
+from test_google_connect import test_google
+from test_telegram_connect import close_session, get_session, test_telegram_api
+
+def positive_float(value):
+    interval = float(value)
+    if not (interval > 0 and math.isfinite(interval)):  # Also rejects nan and inf
+        raise argparse.ArgumentTypeError(f"must be a finite number greater than 0, got {value}")
+    return interval
+
+async def probe_once(session):
+    """Run both probes concurrently so their handshakes overlap."""
+    await asyncio.gather(test_google(), test_telegram_api(session))
+
+async def main(interval=None):
+    # With an interval, keep probing from this one loop and session so DNS cache and pooled connections carry over
+    session = await get_session()
+    try:
+        await probe_once(session)
+        while interval is not None:
+            await asyncio.sleep(interval)
+            await probe_once(session)
+    finally:
+        await close_session()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that Google and the Telegram Bot API are reachable.")
+    parser.add_argument("--interval", type=positive_float, help="keep running and probe again every INTERVAL seconds")
+    args = parser.parse_args()
+    configure_logging()
+    try:
+        run(main(args.interval))
+    except KeyboardInterrupt:
+        pass
@@ -4,12 +4,24 @@
 import os
 import sys
 import logging
-import json
 import html
+import asyncio
 import random
 import traceback
+import functools
+import hashlib
+import sqlite3
+import tempfile
+import time
 import aiohttp
-from datetime import datetime, timedelta, timezone
+import orjson
+from aiolimiter import AsyncLimiter
+from contextlib import closing
+from operator import itemgetter
+from cachetools import TTLCache
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlencode
 
 # Load environment variables from .env if present
 try:
@@ -19,7 +31,7 @@ except ImportError:
     pass  # If python-dotenv is not installed, skip loading .env
 
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters, JobQueue
+from telegram.ext import AIORateLimiter, ApplicationBuilder, CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters, JobQueue
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -31,12 +43,27 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 OMDB_API_KEY = os.getenv("OMDB_API_KEY")
 TVMAZE_API_KEY = os.getenv("TVMAZE_API_KEY")
+ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")  # Optional, enables admin-only commands such as /clearcache
 
 if not TELEGRAM_TOKEN or not TMDB_API_KEY:
     raise EnvironmentError("Please set the TELEGRAM_TOKEN and TMDB_API_KEY environment variables.")
 
 SCOPES = ['https://www.googleapis.com/auth/calendar.events']
 
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+# Max concurrent TMDB requests per fan-out (TMDB allows ~40 requests / 10s)
+TMDB_CONCURRENCY = 20
+# Retry budget for TMDB 429/503 responses (exponential backoff between attempts)
+TMDB_MAX_RETRIES = 5
+# Max concurrent TVmaze schedule requests per fan-out
+TVMAZE_CONCURRENCY = 10
+
+# On-disk HTTP response cache, survives restarts
+HTTP_CACHE_DB = "cache.db"
+
+# Shared HTTP session, created in post_init and closed in post_shutdown
+SESSION: Optional[aiohttp.ClientSession] = None
+
 # ====== Logging Setup ======
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -47,75 +74,189 @@ logger = logging.getLogger(__name__)
 print('main.py starting...', file=sys.stderr)
 try:
     # ====== Helper Functions ======
-    def get_utc_today():
-        from datetime import datetime, timezone
+    @functools.lru_cache(maxsize=1)
+    def _utc_today_for_slot(slot: int):
         return datetime.now(timezone.utc).date()
 
+    def get_utc_today():
+        # Cached per 5-minute slot; handlers call this in tight loops
+        return _utc_today_for_slot(int(time.time() // 300))
+
     async def fetch_json(session: aiohttp.ClientSession, url: str, params: dict):
         """Fetch JSON data asynchronously from a URL with parameters."""
         async with session.get(url, params=params) as response:
             response.raise_for_status()
-            return await response.json()
+            return orjson.loads(await response.read())
+
+    # Keep TMDB traffic under its ~40 requests / 10s limit, with some headroom
+    TMDB_LIMITER = AsyncLimiter(35, 10)
+
+    async def fetch_json_retry(session: aiohttp.ClientSession, url: str, params: dict, base_delay: float = 1.0):
+        """fetch_json with TMDB rate limiting and exponential-backoff retries on 429/503."""
+        for attempt in range(TMDB_MAX_RETRIES + 1):
+            try:
+                if url.startswith(TMDB_BASE_URL):
+                    async with TMDB_LIMITER:
+                        return await fetch_json(session, url, params)
+                return await fetch_json(session, url, params)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in (429, 503) or attempt == TMDB_MAX_RETRIES:
+                    raise
+                try:
+                    retry_after = float((e.headers or {}).get("Retry-After", 0))
+                except ValueError:
+                    retry_after = 0
+                delay = max(retry_after, base_delay * 2 ** attempt + random.random())
+                logger.warning("HTTP %s from %s, retrying in %.1fs", e.status, url, delay)
+                await asyncio.sleep(delay)
+
+    # TMDB response caches: search/discover results for an hour, tv/{id} details for a day
+    TMDB_CACHE = TTLCache(maxsize=4096, ttl=3600)
+    TMDB_DETAILS_CACHE = TTLCache(maxsize=4096, ttl=86400)
+    TMDB_TRENDING_CACHE = TTLCache(maxsize=64, ttl=1800)
+    TVMAZE_CACHE = TTLCache(maxsize=256, ttl=3600)
+
+    def init_http_cache_db():
+        """Create the on-disk HTTP cache table and drop expired rows."""
+        with closing(sqlite3.connect(HTTP_CACHE_DB)) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS http_cache (key TEXT PRIMARY KEY, body BLOB, expires REAL)")
+            conn.execute("DELETE FROM http_cache WHERE expires <= ?", (time.time(),))
+
+    def clear_http_cache_db():
+        with closing(sqlite3.connect(HTTP_CACHE_DB)) as conn, conn:
+            conn.execute("DELETE FROM http_cache")
+
+    def http_cache_key(url: str, params: dict) -> str:
+        return hashlib.blake2b(f"{url}?{urlencode(sorted(params.items()))}".encode()).hexdigest()
+
+    def read_http_cache(key: str):
+        with closing(sqlite3.connect(HTTP_CACHE_DB)) as conn:
+            row = conn.execute(
+                "SELECT body FROM http_cache WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def write_http_cache(key: str, data, ttl: float):
+        body = orjson.dumps(data)
+        with closing(sqlite3.connect(HTTP_CACHE_DB)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, body, expires) VALUES (?, ?, ?)",
+                (key, body, time.time() + ttl)
+            )
+
+    async def cached_fetch_json(session: aiohttp.ClientSession, url: str, params: dict, cache: TTLCache = TMDB_CACHE):
+        """Like fetch_json, but serve repeated (url, params) lookups from memory, then from cache.db."""
+        key = (url, tuple(sorted(params.items())))
+        if key in cache:
+            return cache[key]
+        disk_key = http_cache_key(url, params)
+        try:
+            data = await asyncio.to_thread(read_http_cache, disk_key)
+        except sqlite3.Error:
+            logger.warning("Could not read HTTP cache", exc_info=True)
+            data = None
+        if data is None:
+            data = await fetch_json_retry(session, url, params)
+            try:
+                await asyncio.to_thread(write_http_cache, disk_key, data, cache.ttl)
+            except sqlite3.Error:
+                logger.warning("Could not write HTTP cache", exc_info=True)
+        cache[key] = data
+        return data
+
+    async def fetch_tmdb(path: str, params: dict = None, cache: TTLCache = TMDB_CACHE):
+        """GET a TMDB API path on the shared session, adding the API key and language, through the caches."""
+        query = {"api_key": TMDB_API_KEY, "language": "en-US"}
+        if params:
+            query.update(params)
+        return await cached_fetch_json(SESSION, f"{TMDB_BASE_URL}{path}", query, cache)
+
+    async def post_init(application):
+        """Create the shared aiohttp session once the application starts."""
+        global SESSION
+        connector = aiohttp.TCPConnector(
+            limit=128,
+            limit_per_host=32,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75,
+        )
+        SESSION = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=20, connect=5),
+        )
+        try:
+            await asyncio.to_thread(init_http_cache_db)
+        except sqlite3.Error:
+            logger.warning("Could not initialise HTTP cache, continuing without it", exc_info=True)
+
+    async def post_shutdown(application):
+        """Write any pending list changes and close the shared aiohttp session on shutdown."""
+        global SESSION
+        await flush_highlight_lists(None)
+        if SESSION is not None:
+            await SESSION.close()
+            SESSION = None
 
     async def search_tmdb(query: str = None, media_type: str = "movie", max_results: int = 50):
         """
         Search TMDB API for movies or TV series.
         If query is None, fetch upcoming titles airing in the next 30 days (across multiple pages).
         """
-        base_url = "https://api.themoviedb.org/3"
         results = []
         max_pages = 5  # Avoid excessive API calls
-        async with aiohttp.ClientSession() as session:
-            if query:
-                url = f"{base_url}/search/{media_type}"
-                params = {"api_key": TMDB_API_KEY, "query": query, "language": "en-US", "page": 1}
-                data = await fetch_json(session, url, params)
+        if query:
+            data = await fetch_tmdb(f"/search/{media_type}", {"query": query, "page": 1})
+            results = data.get("results", [])[:max_results]
+        else:
+            now = get_utc_today()
+            cutoff = now + timedelta(days=30)
+            if media_type == "tv":
+                params = {
+                    "sort_by": "popularity.desc",  # Sort by popularity, not air date
+                    "first_air_date.gte": now.isoformat(),
+                    "first_air_date.lte": cutoff.isoformat(),
+                    "page": 1
+                }
+                data = await fetch_tmdb("/discover/tv", params)
                 results = data.get("results", [])[:max_results]
             else:
-                now = get_utc_today()
-                cutoff = now + timedelta(days=30)
-                if media_type == "tv":
-                    url = f"{base_url}/discover/tv"
-                    params = {
-                        "api_key": TMDB_API_KEY,
-                        "language": "en-US",
-                        "sort_by": "popularity.desc",  # Sort by popularity, not air date
-                        "first_air_date.gte": now.isoformat(),
-                        "first_air_date.lte": cutoff.isoformat(),
-                        "page": 1
-                    }
-                    data = await fetch_json(session, url, params)
-                    results = data.get("results", [])[:max_results]
-                else:
-                    page = 1
-                    while len(results) < max_results and page <= max_pages:
-                        url = f"{base_url}/movie/upcoming"
-                        params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": page}
-                        data = await fetch_json(session, url, params)
-                        page_results = data.get("results", [])
-                        for item in page_results:
-                            date_str = item.get("release_date")
-                            if date_str:
-                                try:
-                                    date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                                    if now <= date <= cutoff:
-                                        results.append(item)
-                                        if len(results) >= max_results:
-                                            break
-                                except Exception:
-                                    continue
-                        if not data.get("results") or len(page_results) == 0:
-                            break  # No more pages
-                        page += 1
+                page = 1
+                while len(results) < max_results and page <= max_pages:
+                    data = await fetch_tmdb("/movie/upcoming", {"page": page})
+                    page_results = data.get("results", [])
+                    for item in page_results:
+                        date_str = item.get("release_date")
+                        if date_str:
+                            try:
+                                release_date = date.fromisoformat(date_str)
+                                if now <= release_date <= cutoff:
+                                    results.append(item)
+                                    if len(results) >= max_results:
+                                        break
+                            except Exception:
+                                continue
+                    if not data.get("results") or len(page_results) == 0:
+                        break  # No more pages
+                    page += 1
         return results[:max_results]
 
-    def get_calendar_service():
-        """Authenticate and return Google Calendar API service instance."""
-        creds = None
+    # Google Calendar service, built once and reused while its credentials stay valid
+    _CAL_SERVICE = None
+    _CAL_CREDS = None
+    _CAL_LOCK = asyncio.Lock()  # One refresh/OAuth flow at a time
+
+    def get_calendar_service_sync():
+        """Authenticate and return Google Calendar API service instance (blocking)."""
+        global _CAL_SERVICE, _CAL_CREDS
+        if _CAL_SERVICE is not None and _CAL_CREDS is not None and _CAL_CREDS.valid:
+            return _CAL_SERVICE
+
+        creds = _CAL_CREDS
         token_path = "token.json"
         creds_path = "credentials.json"
 
-        if os.path.exists(token_path):
+        if creds is None and os.path.exists(token_path):
             creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
         if not creds or not creds.valid:
@@ -130,7 +271,20 @@ try:
             with open(token_path, "w", encoding="utf-8") as token_file:
                 token_file.write(creds.to_json())
 
-        return build('calendar', 'v3', credentials=creds)
+        # A refresh updates the cached credentials in place, so the existing client stays usable
+        if _CAL_SERVICE is not None and creds is _CAL_CREDS:
+            return _CAL_SERVICE
+        _CAL_CREDS = creds
+        _CAL_SERVICE = build('calendar', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
+        return _CAL_SERVICE
+
+    async def get_calendar_service():
+        """Return the Google Calendar service, running token refresh or OAuth off the event loop."""
+        if _CAL_SERVICE is not None and _CAL_CREDS is not None and _CAL_CREDS.valid:
+            return _CAL_SERVICE
+        async with _CAL_LOCK:
+            # get_calendar_service_sync returns straight away if another caller finished the refresh first
+            return await asyncio.to_thread(get_calendar_service_sync)
 
     async def search_omdb(title: str, media_type: str = None):
         """Search OMDb API for a movie or series by title."""
@@ -140,155 +294,168 @@ try:
         params = {"apikey": OMDB_API_KEY, "t": title}
         if media_type:
             params["type"] = media_type
-        async with aiohttp.ClientSession() as session:
-            async with session.get(base_url, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+        async with SESSION.get(base_url, params=params) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
 
     # TVMAZE_API_KEY for future use if needed
     if TVMAZE_API_KEY is None:
         print("Warning: TVMAZE_API_KEY environment variable is not set. TVmaze API features may not work.")
 
+    async def fetch_tvmaze_schedule(start, days):
+        """Fetch the US TVmaze schedule for `days` days from `start` concurrently; failed days are skipped."""
+        url = "https://api.tvmaze.com/schedule"
+        sem = asyncio.Semaphore(TVMAZE_CONCURRENCY)
+
+        async def fetch_day(day):
+            params = {"country": "US", "date": day.isoformat()}
+            async with sem:
+                return await cached_fetch_json(SESSION, url, params, TVMAZE_CACHE)
+
+        responses = await asyncio.gather(
+            *(fetch_day(start + timedelta(days=i)) for i in range(days)),
+            return_exceptions=True
+        )
+        return [data for data in responses if not isinstance(data, BaseException)]
+
     async def fetch_tvmaze_upcoming_shows(max_results=10):
         """Fetch upcoming TV shows (including new seasons) from TVmaze schedule API."""
-        import aiohttp
-        from datetime import datetime, timedelta, timezone
-        now = datetime.now(timezone.utc).date()
-        url = f"https://api.tvmaze.com/schedule"
+        now = get_utc_today()
         shows = []
-        async with aiohttp.ClientSession() as session:
-            for i in range(0, 30):
-                day = now + timedelta(days=i)
-                params = {"country": "US", "date": day.isoformat()}
-                async with session.get(url, params=params) as resp:
-                    if resp.status != 200:
-                        continue
-                    data = await resp.json()
-                    for entry in data:
-                        show = entry.get("show", {})
-                        if not show:
-                            continue
-                        # Only add if not already in list (by TVmaze id and season)
-                        unique_key = f"{show.get('id')}_s{entry.get('season')}_e{entry.get('number')}"
-                        if unique_key not in [s.get('unique_key') for s in shows]:
-                            show_copy = show.copy()
-                            show_copy["_episode_name"] = entry.get("name")
-                            show_copy["_airdate"] = entry.get("airdate")
-                            show_copy["_season"] = entry.get("season")
-                            show_copy["_episode"] = entry.get("number")
-                            show_copy["unique_key"] = unique_key
-                            shows.append(show_copy)
-                        if len(shows) >= max_results:
-                            break
+        seen_keys = set()
+        for data in await fetch_tvmaze_schedule(now, 30):
+            for entry in data:
+                show = entry.get("show", {})
+                if not show:
+                    continue
+                # Only add if not already in list (by TVmaze id and season)
+                unique_key = f"{show.get('id')}_s{entry.get('season')}_e{entry.get('number')}"
+                if unique_key not in seen_keys:
+                    seen_keys.add(unique_key)
+                    # Keep only the fields callers use instead of copying the whole show payload
+                    shows.append({
+                        "id": show.get("id"),
+                        "name": show.get("name"),
+                        "rating": show.get("rating"),
+                        "weight": show.get("weight"),
+                        "_episode_name": entry.get("name"),
+                        "_airdate": entry.get("airdate"),
+                        "_season": entry.get("season"),
+                        "_episode": entry.get("number"),
+                        "unique_key": unique_key,
+                    })
                 if len(shows) >= max_results:
                     break
+            if len(shows) >= max_results:
+                break
         return shows[:max_results]
 
-    async def fetch_trending_tv_shows(max_results=10):
-        """Fetch trending TV shows (weekly) from TMDB."""
-        base_url = "https://api.themoviedb.org/3/trending/tv/week"
-        async with aiohttp.ClientSession() as session:
-            params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": 1}
-            data = await fetch_json(session, base_url, params)
-            return data.get("results", [])[:max_results]
+    async def fetch_trending_tv_shows(max_results=10, media_type="tv", pages=None):
+        """
+        Fetch trending TV shows or movies (weekly) from TMDB.
+        Pages (20 results each, enough for max_results by default) are requested concurrently.
+        """
+        if pages is None:
+            pages = max(1, -(-max_results // 20))
+        responses = await asyncio.gather(
+            *(fetch_tmdb(f"/trending/{media_type}/week", {"page": page}, TMDB_TRENDING_CACHE)
+              for page in range(1, pages + 1)),
+            return_exceptions=True
+        )
+        results = []
+        errors = []
+        for response in responses:
+            if isinstance(response, BaseException):
+                logger.warning("Error fetching a trending %s page", media_type, exc_info=response)
+                errors.append(response)
+                continue
+            results.extend(response.get("results", []))
+        if errors and not results:
+            raise errors[0]
+        return results[:max_results]
 
     async def fetch_upcoming_tv_shows(max_results=10):
         """Fetch upcoming TV shows (new shows) from TMDB."""
-        base_url = "https://api.themoviedb.org/3/discover/tv"
         now = get_utc_today()
-        async with aiohttp.ClientSession() as session:
-            params = {
-                "api_key": TMDB_API_KEY,
-                "language": "en-US",
-                "sort_by": "first_air_date.asc",
-                "first_air_date.gte": now.isoformat(),
-                "with_original_language": "en",
-                "page": 1
-            }
-            data = await fetch_json(session, base_url, params)
-            return data.get("results", [])[:max_results]
+        params = {
+            "sort_by": "first_air_date.asc",
+            "first_air_date.gte": now.isoformat(),
+            "with_original_language": "en",
+            "page": 1
+        }
+        data = await fetch_tmdb("/discover/tv", params)
+        return data.get("results", [])[:max_results]
 
     async def fetch_new_seasons_of_popular_shows(max_results=10):
         """Fetch popular TV shows and return those with a new season airing in the future."""
-        base_url = "https://api.themoviedb.org/3/tv/popular"
         now = get_utc_today()
         results = []
-        async with aiohttp.ClientSession() as session:
-            params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": 1}
-            data = await fetch_json(session, base_url, params)
-            for show in data.get("results", []):
-                tv_id = show.get("id")
-                details_url = f"https://api.themoviedb.org/3/tv/{tv_id}"
-                details_params = {"api_key": TMDB_API_KEY, "language": "en-US"}
-                details = await fetch_json(session, details_url, details_params)
-                for season in details.get("seasons", []):
-                    air_date = season.get("air_date")
-                    if air_date:
-                        try:
-                            air_date_obj = datetime.strptime(air_date, "%Y-%m-%d").date()
-                            if air_date_obj >= now:
-                                show_copy = show.copy()
-                                show_copy["_season_number"] = season.get("season_number")
-                                show_copy["_season_air_date"] = air_date
-                                results.append(show_copy)
-                                break
-                        except Exception:
-                            continue
-                if len(results) >= max_results:
-                    break
+        sem = asyncio.Semaphore(TMDB_CONCURRENCY)
+        data = await fetch_tmdb("/tv/popular", {"page": 1})
+        shows = data.get("results", [])
+
+        async def fetch_details(show):
+            async with sem:
+                return await fetch_tmdb(f"/tv/{show.get('id')}", cache=TMDB_DETAILS_CACHE)
+
+        all_details = await asyncio.gather(*(fetch_details(show) for show in shows))
+        for show, details in zip(shows, all_details):
+            for season in details.get("seasons", []):
+                air_date = season.get("air_date")
+                if air_date:
+                    try:
+                        air_date_obj = date.fromisoformat(air_date)
+                        if air_date_obj >= now:
+                            show_copy = show.copy()
+                            show_copy["_season_number"] = season.get("season_number")
+                            show_copy["_season_air_date"] = air_date
+                            results.append(show_copy)
+                            break
+                    except Exception:
+                        continue
+            if len(results) >= max_results:
+                break
         return results[:max_results]
 
     async def fetch_on_the_air_tv_shows(max_results=10):
         """Fetch TV shows currently on the air from TMDB."""
-        base_url = "https://api.themoviedb.org/3/tv/on_the_air"
-        async with aiohttp.ClientSession() as session:
-            params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": 1}
-            data = await fetch_json(session, base_url, params)
-            return data.get("results", [])[:max_results]
+        data = await fetch_tmdb("/tv/on_the_air", {"page": 1})
+        return data.get("results", [])[:max_results]
 
     async def fetch_tvmaze_new_and_returning_shows(days=30, max_results=20):
         """Fetch new series and new season premieres from TVmaze schedule API for the next N days."""
-        import aiohttp
-        from datetime import datetime, timedelta, timezone
-        now = datetime.now(timezone.utc).date()
+        now = get_utc_today()
         exclude_genres = {"soap", "news", "talk", "reality", "game show", "documentary"}
         seen = set()
         shows = []
-        async with aiohttp.ClientSession() as session:
-            for i in range(days):
-                day = now + timedelta(days=i)
-                params = {"country": "US", "date": day.isoformat()}
-                async with session.get("https://api.tvmaze.com/schedule", params=params) as resp:
-                    if resp.status != 200:
-                        continue
-                    data = await resp.json()
-                    for entry in data:
-                        show = entry.get("show", {})
-                        if not show:
-                            continue
-                        genres = [g.lower() for g in show.get("genres", [])]
-                        if any(g in exclude_genres for g in genres):
-                            continue
-                        # Only include if this is a series premiere (season 1, episode 1) or season premiere (episode 1)
-                        season = entry.get("season")
-                        episode = entry.get("number")
-                        airdate = entry.get("airdate")
-                        name = show.get("name", "Untitled")
-                        key = (name.lower(), season, airdate)
-                        if episode == 1 and key not in seen:
-                            shows.append({
-                                "name": name,
-                                "season": season,
-                                "airdate": airdate,
-                                "type": "new" if season == 1 else "season",
-                                "rating": show.get("rating", {}).get("average", "N/A"),
-                                "popularity": show.get("weight", 0),
-                            })
-                            seen.add(key)
-                        if len(shows) >= max_results:
-                            break
+        for data in await fetch_tvmaze_schedule(now, days):
+            for entry in data:
+                show = entry.get("show", {})
+                if not show:
+                    continue
+                genres = [g.lower() for g in show.get("genres", [])]
+                if any(g in exclude_genres for g in genres):
+                    continue
+                # Only include if this is a series premiere (season 1, episode 1) or season premiere (episode 1)
+                season = entry.get("season")
+                episode = entry.get("number")
+                airdate = entry.get("airdate")
+                name = show.get("name", "Untitled")
+                key = (name.lower(), season, airdate)
+                if episode == 1 and key not in seen:
+                    shows.append({
+                        "name": name,
+                        "season": season,
+                        "airdate": airdate,
+                        "type": "new" if season == 1 else "season",
+                        "rating": show.get("rating", {}).get("average", "N/A"),
+                        "popularity": show.get("weight", 0),
+                    })
+                    seen.add(key)
                 if len(shows) >= max_results:
                     break
+            if len(shows) >= max_results:
+                break
         return shows
 
     # Global set for highlight series (user can add to this at runtime)
@@ -323,31 +490,92 @@ try:
         "napoleon",
         "the creator"
     ])
-    favourite_series = set()
-    favourite_movies = set()
+    # Favourites map casefolded name -> name as the user typed it
+    favourite_series = {}
+    favourite_movies = {}
+    # Casefolded copies of the highlight sets, matched against TMDB names
+    highlight_titles_cf = set()
+    highlight_movies_cf = set()
+
+    def rebuild_highlight_index():
+        """Refresh the casefolded highlight sets after the originals change."""
+        highlight_titles_cf.clear()
+        highlight_titles_cf.update(title.casefold() for title in highlight_titles)
+        highlight_movies_cf.clear()
+        highlight_movies_cf.update(title.casefold() for title in highlight_movies)
+
+    @functools.lru_cache(maxsize=1024)
+    def display_title(title: str) -> str:
+        """Title-cased, HTML-escaped form of a stored (lowercase) highlight title."""
+        return html.escape(title.title())
+
+    rebuild_highlight_index()
+
+    def load_json(path: str, default):
+        """Load a JSON state file, or return `default` if it doesn't exist yet."""
+        if not os.path.exists(path):
+            return default
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    def write_json_atomic(path: str, data):
+        """Write to a temp file and swap it in, so a crash never leaves a partial file."""
+        # A unique temp file per write, so concurrent writers never clobber each other's file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
     HIGHLIGHT_LISTS_FILE = "highlight_lists.json"
+    HIGHLIGHT_LISTS_FLUSH_INTERVAL = 30  # Seconds between flushes of pending list changes
+    highlight_lists_dirty = False
+    highlight_lists_flush_scheduled = False  # Set once the flush job is running; until then edits are written directly
 
     def load_highlight_lists():
-        if os.path.exists(HIGHLIGHT_LISTS_FILE):
-            with open(HIGHLIGHT_LISTS_FILE, "r") as f:
-                data = json.load(f)
-                return (
-                    set(data.get("series", [])),
-                    set(data.get("movies", [])),
-                    set(data.get("favourite_series", [])),
-                    set(data.get("favourite_movies", [])),
-                )
-        return None, None, None, None
-
-    def save_highlight_lists():
-        with open(HIGHLIGHT_LISTS_FILE, "w") as f:
-            json.dump({
-                "series": list(highlight_titles),
-                "movies": list(highlight_movies),
-                "favourite_series": list(favourite_series),
-                "favourite_movies": list(favourite_movies)
-            }, f)
+        data = load_json(HIGHLIGHT_LISTS_FILE, None)
+        if data is None:
+            return None, None, None, None
+        return (
+            set(data.get("series", [])),
+            set(data.get("movies", [])),
+            {name.casefold(): name for name in data.get("favourite_series", [])},
+            {name.casefold(): name for name in data.get("favourite_movies", [])},
+        )
+
+    def highlight_lists_snapshot():
+        return {
+            "series": list(highlight_titles),
+            "movies": list(highlight_movies),
+            "favourite_series": list(favourite_series.values()),
+            "favourite_movies": list(favourite_movies.values())
+        }
+
+    def mark_highlight_lists_dirty():
+        """Schedule the lists to be written by the next flush_highlight_lists run."""
+        global highlight_lists_dirty
+        rebuild_highlight_index()
+        if not highlight_lists_flush_scheduled:
+            write_json_atomic(HIGHLIGHT_LISTS_FILE, highlight_lists_snapshot())
+            return
+        highlight_lists_dirty = True
+
+    async def flush_highlight_lists(context: ContextTypes.DEFAULT_TYPE):
+        """Write pending list changes off the event loop, coalescing bursts of edits."""
+        global highlight_lists_dirty
+        if not highlight_lists_dirty:
+            return
+        highlight_lists_dirty = False
+        try:
+            await asyncio.to_thread(write_json_atomic, HIGHLIGHT_LISTS_FILE, highlight_lists_snapshot())
+        except OSError:
+            highlight_lists_dirty = True
+            logger.error("Error saving highlight lists", exc_info=True)
 
     async def addseries(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not context.args:
@@ -387,7 +615,7 @@ try:
         year = show.get("first_air_date", "TBA")[:4]
         entry = f"{name} ({year})"
         highlight_titles.add(entry.lower())
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         await update.message.reply_text(f"Added '{entry}' to your highlight series list.")
         user_addseries_context.pop(chat_id, None)
         return ConversationHandler.END
@@ -429,71 +657,169 @@ try:
         year = movie.get("release_date", "TBA")[:4]
         entry = f"{title} ({year})"
         highlight_movies.add(entry.lower())
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         await update.message.reply_text(f"Added '{entry}' to your highlight movies list.")
         user_addmovie_context.pop(chat_id, None)
         return ConversationHandler.END
 
     NOTIFY_INTERVAL = 24 * 60 * 60  # 24 hours in seconds (daily)
     NOTIFY_LOOKAHEAD_DAYS = 3  # Notify if release is within 3 days
+    NOTIFIED_RELEASES_FILE = "notified_releases.json"
+    NOTIFIED_RETENTION_DAYS = 7  # Forget an announced release a week after it came out
+    notified_releases = set()  # (chat_id, title, release date) already announced
+    NOTIFY_SUBSCRIBERS_FILE = "notify_subscribers.json"
+    NOTIFY_CONCURRENCY = 30  # Matches Telegram's global limit of ~30 messages per second
+    notify_subscribers = set()  # Chat IDs that enabled /notifyon
+    NOTIFY_LOCK = asyncio.Lock()
 
-    async def notify_releases(context: ContextTypes.DEFAULT_TYPE):
-        # Check for upcoming releases in highlight lists
+    async def collect_highlight_seasons(horizon_days: int):
+        """
+        Return (details, season_number, air_date) for every season of a highlight series
+        airing between today and `horizon_days` from now. Shared by /series and notify_releases.
+        """
+        now = get_utc_today()
+        cutoff = now + timedelta(days=horizon_days)
+        sem = asyncio.Semaphore(TMDB_CONCURRENCY)
+        details_tasks = {}  # tv_id -> task, so a show matched by several highlights is fetched once
+
+        async def fetch_details(tv_id):
+            async with sem:
+                return await fetch_tmdb(f"/tv/{tv_id}", cache=TMDB_DETAILS_CACHE)
+
+        async def search_highlight(highlight):
+            async with sem:
+                data = await fetch_tmdb("/search/tv", {"query": highlight})
+            # Drop non-matching results before paying for their tv/{id} request
+            for show in data.get('results', []):
+                tv_id = show.get('id')
+                if show.get('name', '').casefold() == highlight and tv_id not in details_tasks:
+                    details_tasks[tv_id] = asyncio.ensure_future(fetch_details(tv_id))
+
+        search_tasks = [asyncio.ensure_future(search_highlight(highlight)) for highlight in list(highlight_titles_cf)]
+        try:
+            await asyncio.gather(*search_tasks)
+            all_details = await asyncio.gather(*details_tasks.values())
+        except BaseException:
+            # Don't leave sibling searches or detail fetches running unobserved
+            pending = search_tasks + list(details_tasks.values())
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        seasons = []
+        for details in all_details:
+            for season in details.get('seasons', []):
+                air_date = season.get('air_date')
+                season_number = season.get('season_number')
+                if air_date and season_number:
+                    try:
+                        airdate_obj = date.fromisoformat(air_date)
+                    except Exception:
+                        continue
+                    if now <= airdate_obj <= cutoff:
+                        seasons.append((details, season_number, air_date))
+        return seasons
+
+    # Upcoming releases per (day, highlight lists), shared by every chat's notification job
+    UPCOMING_RELEASES_CACHE = TTLCache(maxsize=8, ttl=3600)
+
+    async def collect_upcoming_releases():
+        """
+        Return (series, movies) lists of (title, release date, message line) for highlight
+        releases within NOTIFY_LOOKAHEAD_DAYS. The result is computed once and reused across chats.
+        """
         now = get_utc_today()
+        cache_key = (now, frozenset(highlight_titles), frozenset(highlight_movies))
+        if cache_key in UPCOMING_RELEASES_CACHE:
+            return UPCOMING_RELEASES_CACHE[cache_key]
         cutoff = now + timedelta(days=NOTIFY_LOOKAHEAD_DAYS)
-        chat_id = context.job.chat_id
         # Series
         upcoming_series = []
-        async with aiohttp.ClientSession() as session:
-            for highlight in highlight_titles:
-                url = f"https://api.themoviedb.org/3/search/tv"
-                params = {"api_key": TMDB_API_KEY, "language": "en-US", "query": highlight}
-                data = await fetch_json(session, url, params)
-                for show in data.get('results', []):
-                    tv_id = show.get('id')
-                    details_url = f"https://api.themoviedb.org/3/tv/{tv_id}"
-                    details = await fetch_json(session, details_url, {"api_key": TMDB_API_KEY, "language": "en-US"})
-                    name = details.get('name', '').lower()
-                    if name != highlight:
-                        continue
-                    for season in details.get('seasons', []):
-                        air_date = season.get('air_date')
-                        season_number = season.get('season_number')
-                        if air_date and season_number:
-                            try:
-                                airdate_obj = datetime.strptime(air_date, "%Y-%m-%d").date()
-                            except Exception:
-                                airdate_obj = None
-                            if airdate_obj and now <= airdate_obj <= cutoff:
-                                label = f"Season {season_number}"
-                                upcoming_series.append(f"<b>{html.escape(details.get('name'))}</b> - {label} releases on <b>{air_date}</b>")
+        for details, season_number, air_date in await collect_highlight_seasons(NOTIFY_LOOKAHEAD_DAYS):
+            label = f"Season {season_number}"
+            upcoming_series.append((
+                f"{details.get('name')} {label}",
+                air_date,
+                f"<b>{html.escape(details.get('name'))}</b> - {label} releases on <b>{air_date}</b>"
+            ))
         # Movies
         upcoming_movies = []
-        for highlight in highlight_movies:
-            url = f"https://api.themoviedb.org/3/search/movie"
-            params = {"api_key": TMDB_API_KEY, "language": "en-US", "query": highlight}
-            async with aiohttp.ClientSession() as session:
-                data = await fetch_json(session, url, params)
-                for movie in data.get('results', []):
-                    title = movie.get('title', '').lower()
-                    if title != highlight:
-                        continue
-                    release_date = movie.get('release_date')
-                    if release_date:
-                        try:
-                            release_obj = datetime.strptime(release_date, "%Y-%m-%d").date()
-                        except Exception:
-                            release_obj = None
-                        if release_obj and now <= release_obj <= cutoff:
-                            upcoming_movies.append(f"<b>{html.escape(movie.get('title'))}</b> releases on <b>{release_date}</b>")
-        # Send notification if any
-        if upcoming_series or upcoming_movies:
-            msg = "<b>Upcoming Releases:</b>\n"
-            if upcoming_series:
-                msg += "\n".join(upcoming_series) + "\n"
-            if upcoming_movies:
-                msg += "\n".join(upcoming_movies)
-            await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='HTML')
+        sem = asyncio.Semaphore(TMDB_CONCURRENCY)
+
+        async def search_movie(highlight):
+            async with sem:
+                return await fetch_tmdb("/search/movie", {"query": highlight})
+
+        movie_highlights = list(highlight_movies_cf)
+        movie_searches = await asyncio.gather(*(search_movie(highlight) for highlight in movie_highlights))
+        for highlight, data in zip(movie_highlights, movie_searches):
+            for movie in data.get('results', []):
+                title = movie.get('title', '').casefold()
+                if title != highlight:
+                    continue
+                release_date = movie.get('release_date')
+                if release_date:
+                    try:
+                        release_obj = date.fromisoformat(release_date)
+                    except Exception:
+                        release_obj = None
+                    if release_obj and now <= release_obj <= cutoff:
+                        upcoming_movies.append((
+                            movie.get('title'),
+                            release_date,
+                            f"<b>{html.escape(movie.get('title'))}</b> releases on <b>{release_date}</b>"
+                        ))
+        UPCOMING_RELEASES_CACHE[cache_key] = (upcoming_series, upcoming_movies)
+        return upcoming_series, upcoming_movies
+
+    async def notify_releases(context: ContextTypes.DEFAULT_TYPE):
+        """
+        Announce upcoming highlight releases. The daily job covers every subscribed chat,
+        a job started with a chat_id covers just that chat. Releases are fetched once per run.
+        """
+        async with NOTIFY_LOCK:  # Overlapping runs would both send, and both persist, the same releases
+            now = get_utc_today()
+            chat_ids = [context.job.chat_id] if context.job.chat_id is not None else list(notify_subscribers)
+            if not chat_ids:
+                return
+            all_series, all_movies = await collect_upcoming_releases()
+            semaphore = asyncio.Semaphore(NOTIFY_CONCURRENCY)
+
+            async def notify_chat(chat_id):
+                chat_keys = set()
+                upcoming_series = []
+                upcoming_movies = []
+                for releases, lines in ((all_series, upcoming_series), (all_movies, upcoming_movies)):
+                    for title, release_date, line in releases:
+                        key = (chat_id, title, release_date)
+                        if key not in notified_releases:
+                            chat_keys.add(key)
+                            lines.append(line)
+                if not chat_keys:
+                    return chat_keys
+                msg = "<b>Upcoming Releases:</b>\n"
+                if upcoming_series:
+                    msg += "\n".join(upcoming_series) + "\n"
+                if upcoming_movies:
+                    msg += "\n".join(upcoming_movies)
+                async with semaphore:
+                    await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='HTML')
+                return chat_keys
+
+            sent_keys = set()
+            results = await asyncio.gather(*(notify_chat(chat_id) for chat_id in chat_ids), return_exceptions=True)
+            for chat_id, result in zip(chat_ids, results):
+                if isinstance(result, Exception):
+                    logger.error("Error sending notification to chat %s", chat_id, exc_info=result)
+                else:
+                    sent_keys.update(result)
+            # Remember what was sent and forget releases that are long past
+            expired_before = (now - timedelta(days=NOTIFIED_RETENTION_DAYS)).isoformat()
+            expired = {key for key in notified_releases if key[2] < expired_before}
+            if sent_keys or expired:
+                notified_releases.difference_update(expired)
+                notified_releases.update(sent_keys)
+                await asyncio.to_thread(write_json_atomic, NOTIFIED_RELEASES_FILE, list(notified_releases))
 
     async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
@@ -533,42 +859,24 @@ try:
             "/removefaveseries [series name] - Remove a series from your favourites.\n"
             "/removefavemovie [movie name] - Remove a movie from your favourites.\n"
             "/listfaveseries - List all your favourite series.\n"
-            "/listfavemovies - List all your favourite movies.",
+            "/listfavemovies - List all your favourite movies.\n\n"
+            "<b>Admin</b>\n"
+            "/clearcache - Clear cached TMDB and TVmaze responses (admin only).",
             parse_mode='HTML')
 
     async def series(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Fetching new/returning seasons for your highlight series in the next 120 days...")
         try:
-            now = get_utc_today()
-            cutoff = now + timedelta(days=120)
             messages = []
             shows_to_display = []
-            # Only process highlight_titles
-            async with aiohttp.ClientSession() as session:
-                for highlight in highlight_titles:
-                    url = f"https://api.themoviedb.org/3/search/tv"
-                    params = {"api_key": TMDB_API_KEY, "language": "en-US", "query": highlight}
-                    data = await fetch_json(session, url, params)
-                    for show in data.get('results', []):
-                        tv_id = show.get('id')
-                        details_url = f"https://api.themoviedb.org/3/tv/{tv_id}"
-                        details = await fetch_json(session, details_url, {"api_key": TMDB_API_KEY, "language": "en-US"})
-                        name = details.get('name', '').lower()
-                        if name != highlight:
-                            continue
-                        # New season
-                        for season in details.get('seasons', []):
-                            air_date = season.get('air_date')
-                            season_number = season.get('season_number')
-                            if air_date and season_number and (season_number == 1 or season_number > 1):
-                                try:
-                                    airdate_obj = datetime.strptime(air_date, "%Y-%m-%d").date()
-                                except Exception:
-                                    airdate_obj = None
-                                if airdate_obj and now <= airdate_obj <= cutoff:
-                                    show_type = 'new' if season_number == 1 else f'season_{season_number}'
-                                    shows_to_display.append((details, show_type, air_date, True))
-                                    break
+            seen_ids = set()
+            # Only process highlight_titles; keep the first upcoming season of each show
+            for details, season_number, air_date in await collect_highlight_seasons(120):
+                if details.get('id') in seen_ids:
+                    continue
+                seen_ids.add(details.get('id'))
+                show_type = 'new' if season_number == 1 else f'season_{season_number}'
+                shows_to_display.append((details, show_type, air_date, True))
             # Deduplicate by (name.lower(), show_type, air_date)
             deduped = {}
             for details, show_type, air_date, force_highlight in shows_to_display:
@@ -576,13 +884,12 @@ try:
                 key = (name.lower(), show_type, air_date)
                 if key not in deduped:
                     deduped[key] = (details, show_type, air_date, force_highlight)
-            sorted_shows = sorted(
-                deduped.values(),
-                key=lambda x: (
-                    -int(x[0].get('popularity', 0) or 0),
-                    x[2] or x[0].get('first_air_date', '')
-                )
-            )
+            keyed = [
+                ((-int(v[0].get('popularity', 0) or 0), v[2] or v[0].get('first_air_date', '')), v)
+                for v in deduped.values()
+            ]
+            keyed.sort(key=itemgetter(0))
+            sorted_shows = [v for _, v in keyed]
             for details, show_type, air_date, force_highlight in sorted_shows:
                 name = details.get('name', 'Untitled')
                 rating = details.get('vote_average', 'N/A')
@@ -614,6 +921,35 @@ try:
     async def chatid(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"Your chat ID is: {update.effective_chat.id}")
 
+    async def clearcache(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if not ADMIN_CHAT_ID or str(update.effective_chat.id) != ADMIN_CHAT_ID:
+            await update.message.reply_text("This command is only available to the bot admin.")
+            return
+        for cache in (TMDB_CACHE, TMDB_DETAILS_CACHE, TMDB_TRENDING_CACHE, TVMAZE_CACHE, UPCOMING_RELEASES_CACHE):
+            cache.clear()
+        try:
+            await asyncio.to_thread(clear_http_cache_db)
+        except sqlite3.Error:
+            logger.warning("Could not clear HTTP cache", exc_info=True)
+        await update.message.reply_text("🧹 Cleared all cached TMDB and TVmaze responses.")
+
+    # Reply templates for the TMDB list commands
+    MOVIE_TMPL = "🎬 <b>{t}</b>\n📅 Release Date: <b>{d}</b>\n⭐ Rating: <b>{r}</b>\n🔥 Popularity: <b>{p}</b>"
+    POSTER_PREFIX = "https://image.tmdb.org/t/p/w200"
+
+    def poster_link(poster_path, sep=" | "):
+        """HTML link to a TMDB poster, or an empty string when there is none."""
+        return f"{sep}<a href='{POSTER_PREFIX}{poster_path}'>Poster</a>" if poster_path else ""
+
+    def list_item_formatter(name_key: str, date_key: str):
+        """Build a one-line formatter for TMDB results with the title and date fields baked in."""
+        def fmt(item):
+            return f"<b>{html.escape(item.get(name_key, 'Untitled'))}</b> ({item.get(date_key, 'TBA')})" + poster_link(item.get("poster_path"))
+        return fmt
+
+    FMT_TV = list_item_formatter("name", "first_air_date")
+    FMT_MOVIE = list_item_formatter("title", "release_date")
+
     async def movies(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Fetching upcoming movies...")
         try:
@@ -621,15 +957,15 @@ try:
             if not results:
                 await update.message.reply_text("No upcoming movies found.")
                 return
-            messages = []
-            for movie in results:
-                title = movie.get("title")
-                release_date = movie.get("release_date")
-                rating = movie.get("vote_average")
-                popularity = movie.get("popularity")
-                msg = f"🎬 <b>{html.escape(title)}</b>\n📅 Release Date: <b>{release_date}</b>\n⭐ Rating: <b>{rating}</b>\n🔥 Popularity: <b>{popularity}</b>"
-                messages.append(msg)
-            reply = "<b>Upcoming Movies:</b>\n\n" + "\n\n".join(messages)
+            reply = "<b>Upcoming Movies:</b>\n\n" + "\n\n".join(
+                MOVIE_TMPL.format_map({
+                    "t": html.escape(movie.get("title") or ""),
+                    "d": movie.get("release_date"),
+                    "r": movie.get("vote_average"),
+                    "p": movie.get("popularity"),
+                })
+                for movie in results
+            )
             await update.message.reply_text(reply, parse_mode='HTML')
         except Exception as e:
             logger.error("Error fetching movies", exc_info=True)
@@ -639,14 +975,14 @@ try:
         if not highlight_titles:
             await update.message.reply_text("Your highlight series list is empty.")
             return
-        highlight_list = '\n'.join(f"- <b>{html.escape(title.title())}</b>" for title in sorted(highlight_titles))
+        highlight_list = '\n'.join(f"- <b>{display_title(title)}</b>" for title in sorted(highlight_titles))
         await update.message.reply_text(f"<b>Your Highlight Series List:</b>\n{highlight_list}", parse_mode='HTML')
 
     async def listmovies(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not highlight_movies:
             await update.message.reply_text("Your highlight movies list is empty.")
             return
-        movie_list = '\n'.join(f"- <b>{html.escape(title.title())}</b>" for title in sorted(highlight_movies))
+        movie_list = '\n'.join(f"- <b>{display_title(title)}</b>" for title in sorted(highlight_movies))
         await update.message.reply_text(f"<b>Your Highlight Movies List:</b>\n{movie_list}", parse_mode='HTML')
 
     async def removeseries(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -655,11 +991,11 @@ try:
             return
         title = " ".join(context.args).strip().lower()
         if title not in highlight_titles:
-            await update.message.reply_text(f"'{html.escape(title.title())}' is not in your highlight series list.")
+            await update.message.reply_text(f"'{display_title(title)}' is not in your highlight series list.")
             return
         highlight_titles.remove(title)
-        save_highlight_lists()
-        await update.message.reply_text(f"Removed '{html.escape(title.title())}' from your highlight series list.")
+        mark_highlight_lists_dirty()
+        await update.message.reply_text(f"Removed '{display_title(title)}' from your highlight series list.")
 
     async def removemovie(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not context.args:
@@ -667,11 +1003,11 @@ try:
             return
         title = " ".join(context.args).strip().lower()
         if title not in highlight_movies:
-            await update.message.reply_text(f"'{html.escape(title.title())}' is not in your highlight movies list.")
+            await update.message.reply_text(f"'{display_title(title)}' is not in your highlight movies list.")
             return
         highlight_movies.remove(title)
-        save_highlight_lists()
-        await update.message.reply_text(f"Removed '{html.escape(title.title())}' from your highlight movies list.")
+        mark_highlight_lists_dirty()
+        await update.message.reply_text(f"Removed '{display_title(title)}' from your highlight movies list.")
 
     async def addmovie(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not context.args:
@@ -696,25 +1032,17 @@ try:
         await update.message.reply_text("Picking a random TV series from TMDB...")
         try:
             # Get a random page and random result from TMDB popular TV
-            import random
             page = random.randint(1, 100)  # TMDB allows up to 500 pages
-            base_url = "https://api.themoviedb.org/3/tv/popular"
-            async with aiohttp.ClientSession() as session:
-                params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": page}
-                data = await fetch_json(session, base_url, params)
-                shows = data.get("results", [])
-                if not shows:
-                    await update.message.reply_text("No series found.")
-                    return
-                pick = random.choice(shows)
-                name = pick.get("name", "Untitled")
-                date = pick.get("first_air_date", "TBA")
-                poster = pick.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(name)}</b> ({date})"
-                if poster_url:
-                    msg += f"\n<a href='{poster_url}'>Poster</a>"
-                await update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=False)
+            data = await fetch_tmdb("/tv/popular", {"page": page})
+            shows = data.get("results", [])
+            if not shows:
+                await update.message.reply_text("No series found.")
+                return
+            pick = random.choice(shows)
+            name = pick.get("name", "Untitled")
+            date = pick.get("first_air_date", "TBA")
+            msg = f"<b>{html.escape(name)}</b> ({date})" + poster_link(pick.get("poster_path"), sep="\n")
+            await update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error in randomseries", exc_info=True)
             await update.message.reply_text("Sorry, an error occurred while picking a random series.")
@@ -722,25 +1050,17 @@ try:
     async def randommovie(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Picking a random movie from TMDB...")
         try:
-            import random
             page = random.randint(1, 100)
-            base_url = "https://api.themoviedb.org/3/movie/popular"
-            async with aiohttp.ClientSession() as session:
-                params = {"api_key": TMDB_API_KEY, "language": "en-US", "page": page}
-                data = await fetch_json(session, base_url, params)
-                movies = data.get("results", [])
-                if not movies:
-                    await update.message.reply_text("No movies found.")
-                    return
-                pick = random.choice(movies)
-                title = pick.get("title", "Untitled")
-                date = pick.get("release_date", "TBA")
-                poster = pick.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(title)}</b> ({date})"
-                if poster_url:
-                    msg += f"\n<a href='{poster_url}'>Poster</a>"
-                await update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=False)
+            data = await fetch_tmdb("/movie/popular", {"page": page})
+            movies = data.get("results", [])
+            if not movies:
+                await update.message.reply_text("No movies found.")
+                return
+            pick = random.choice(movies)
+            title = pick.get("title", "Untitled")
+            date = pick.get("release_date", "TBA")
+            msg = f"<b>{html.escape(title)}</b> ({date})" + poster_link(pick.get("poster_path"), sep="\n")
+            await update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error in randommovie", exc_info=True)
             await update.message.reply_text("Sorry, an error occurred while picking a random movie.")
@@ -752,17 +1072,7 @@ try:
             if not results:
                 await update.message.reply_text("No trending TV series found.")
                 return
-            messages = []
-            for show in results:
-                name = show.get("name", "Untitled")
-                date = show.get("first_air_date", "TBA")
-                poster = show.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(name)}</b> ({date})"
-                if poster_url:
-                    msg += f" | <a href='{poster_url}'>Poster</a>"
-                messages.append(msg)
-            reply = "<b>Trending TV Series:</b>\n" + "\n".join(messages)
+            reply = "<b>Trending TV Series:</b>\n" + "\n".join(map(FMT_TV, results))
             await update.message.reply_text(reply, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error fetching trending series", exc_info=True)
@@ -775,17 +1085,7 @@ try:
             if not results:
                 await update.message.reply_text("No trending movies found.")
                 return
-            messages = []
-            for movie in results:
-                title = movie.get("title", "Untitled")
-                release_date = movie.get("release_date", "TBA")
-                poster = movie.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(title)}</b> ({release_date})"
-                if poster_url:
-                    msg += f" | <a href='{poster_url}'>Poster</a>"
-                messages.append(msg)
-            reply = "<b>Trending Movies:</b>\n" + "\n".join(messages)
+            reply = "<b>Trending Movies:</b>\n" + "\n".join(map(FMT_MOVIE, results))
             await update.message.reply_text(reply, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error fetching trending movies", exc_info=True)
@@ -798,17 +1098,7 @@ try:
             if not results:
                 await update.message.reply_text("No top-rated TV series found.")
                 return
-            messages = []
-            for show in results:
-                name = show.get("name", "Untitled")
-                date = show.get("first_air_date", "TBA")
-                poster = show.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(name)}</b> ({date})"
-                if poster_url:
-                    msg += f" | <a href='{poster_url}'>Poster</a>"
-                messages.append(msg)
-            reply = "<b>Top-Rated TV Series:</b>\n" + "\n".join(messages)
+            reply = "<b>Top-Rated TV Series:</b>\n" + "\n".join(map(FMT_TV, results))
             await update.message.reply_text(reply, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error fetching top series", exc_info=True)
@@ -821,17 +1111,7 @@ try:
             if not results:
                 await update.message.reply_text("No top-rated movies found.")
                 return
-            messages = []
-            for movie in results:
-                title = movie.get("title", "Untitled")
-                release_date = movie.get("release_date", "TBA")
-                poster = movie.get("poster_path")
-                poster_url = f"https://image.tmdb.org/t/p/w200{poster}" if poster else None
-                msg = f"<b>{html.escape(title)}</b> ({release_date})"
-                if poster_url:
-                    msg += f" | <a href='{poster_url}'>Poster</a>"
-                messages.append(msg)
-            reply = "<b>Top-Rated Movies:</b>\n" + "\n".join(messages)
+            reply = "<b>Top-Rated Movies:</b>\n" + "\n".join(map(FMT_MOVIE, results))
             await update.message.reply_text(reply, parse_mode='HTML', disable_web_page_preview=False)
         except Exception as e:
             logger.error("Error fetching top movies", exc_info=True)
@@ -848,18 +1128,10 @@ try:
         if job_queue is None:
             await update.message.reply_text("❌ JobQueue is not available. Please ensure the bot is started with job_queue enabled.")
             return
-        # Remove any existing job for this chat
-        current_jobs = job_queue.get_jobs_by_name(str(chat_id))
-        for job in current_jobs:
-            job.schedule_removal()
-        # Schedule a new daily job
-        job_queue.run_repeating(
-            notify_releases,
-            interval=NOTIFY_INTERVAL,
-            first=0,  # Run immediately, then every 24h
-            chat_id=chat_id,
-            name=str(chat_id),
-        )
+        notify_subscribers.add(chat_id)
+        await asyncio.to_thread(write_json_atomic, NOTIFY_SUBSCRIBERS_FILE, list(notify_subscribers))
+        # Check this chat right away; the shared daily job covers it from then on
+        job_queue.run_once(notify_releases, 0, chat_id=chat_id)
         await update.message.reply_text("🔔 Daily release notifications enabled! You'll get a message when a highlight series or movie is about to be released.")
 
     async def notifyoff(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -868,9 +1140,9 @@ try:
         if job_queue is None:
             await update.message.reply_text("❌ JobQueue is not available. Please ensure the bot is started with job_queue enabled.")
             return
-        current_jobs = job_queue.get_jobs_by_name(str(chat_id))
-        for job in current_jobs:
-            job.schedule_removal()
+        if chat_id in notify_subscribers:
+            notify_subscribers.discard(chat_id)
+            await asyncio.to_thread(write_json_atomic, NOTIFY_SUBSCRIBERS_FILE, list(notify_subscribers))
         await update.message.reply_text("🔕 Daily release notifications disabled.")
 
     async def addfaveseries(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -886,12 +1158,13 @@ try:
         added = []
         already = []
         for entry in series_list:
-            if entry.lower() in (s.lower() for s in favourite_series):
+            key = entry.casefold()
+            if key in favourite_series:
                 already.append(entry)
             else:
-                favourite_series.add(entry)
+                favourite_series[key] = entry
                 added.append(entry)
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         msg = ""
         if added:
             msg += "Added to your favourite series list:\n" + "\n".join(f"- {a}" for a in added)
@@ -914,12 +1187,13 @@ try:
         added = []
         already = []
         for entry in movies:
-            if entry.lower() in (m.lower() for m in favourite_movies):
+            key = entry.casefold()
+            if key in favourite_movies:
                 already.append(entry)
             else:
-                favourite_movies.add(entry)
+                favourite_movies[key] = entry
                 added.append(entry)
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         msg = ""
         if added:
             msg += "Added to your favourite movies list:\n" + "\n".join(f"- {a}" for a in added)
@@ -934,16 +1208,11 @@ try:
             await update.message.reply_text("Usage: /removefaveseries [series name]")
             return
         name = " ".join(context.args).strip()
-        found = None
-        for s in favourite_series:
-            if s.lower() == name.lower():
-                found = s
-                break
+        found = favourite_series.pop(name.casefold(), None)
         if not found:
             await update.message.reply_text(f"'{name}' is not in your favourite series list.")
             return
-        favourite_series.remove(found)
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         await update.message.reply_text(f"Removed '{found}' from your favourite series list.")
 
     async def removefavemovie(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -951,23 +1220,18 @@ try:
             await update.message.reply_text("Usage: /removefavemovie [movie name]")
             return
         name = " ".join(context.args).strip()
-        found = None
-        for m in favourite_movies:
-            if m.lower() == name.lower():
-                found = m
-                break
+        found = favourite_movies.pop(name.casefold(), None)
         if not found:
             await update.message.reply_text(f"'{name}' is not in your favourite movies list.")
             return
-        favourite_movies.remove(found)
-        save_highlight_lists()
+        mark_highlight_lists_dirty()
         await update.message.reply_text(f"Removed '{found}' from your favourite movies list.")
 
     async def listfaveseries(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not favourite_series:
             await update.message.reply_text("Your favourite series list is empty.")
             return
-        sorted_list = sorted(favourite_series, key=lambda x: x.lower())
+        sorted_list = sorted(favourite_series.values(), key=str.lower)
         msg = '\n'.join(f"- <b>{html.escape(s)}</b>" for s in sorted_list)
         await update.message.reply_text(f"<b>Your Favourite Series List:</b>\n{msg}", parse_mode='HTML')
 
@@ -975,7 +1239,7 @@ try:
         if not favourite_movies:
             await update.message.reply_text("Your favourite movies list is empty.")
             return
-        sorted_list = sorted(favourite_movies, key=lambda x: x.lower())
+        sorted_list = sorted(favourite_movies.values(), key=str.lower)
         msg = '\n'.join(f"- <b>{html.escape(m)}</b>" for m in sorted_list)
         await update.message.reply_text(f"<b>Your Favourite Movies List:</b>\n{msg}", parse_mode='HTML')
 
@@ -990,10 +1254,37 @@ try:
             favourite_series = loaded_faveseries
         if loaded_favemovies is not None:
             favourite_movies = loaded_favemovies
+        rebuild_highlight_index()
+        notified_releases = {tuple(entry) for entry in load_json(NOTIFIED_RELEASES_FILE, [])}
+        notify_subscribers = set(load_json(NOTIFY_SUBSCRIBERS_FILE, []))
 
-        app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+        app = (
+            ApplicationBuilder()
+            .token(TELEGRAM_TOKEN)
+            # Throttle outgoing messages to Telegram's limits (30/s overall, 20/min per group chat) and retry on RetryAfter
+            .rate_limiter(AIORateLimiter(max_retries=3))
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
+            .build()
+        )
+        if app.job_queue is None:
+            logger.warning("JobQueue is not available; highlight lists are saved on every change and notifications are disabled.")
+        else:
+            app.job_queue.run_repeating(
+                flush_highlight_lists,
+                interval=HIGHLIGHT_LISTS_FLUSH_INTERVAL,
+                name="flush_highlight_lists",
+            )
+            highlight_lists_flush_scheduled = True
+            app.job_queue.run_repeating(
+                notify_releases,
+                interval=NOTIFY_INTERVAL,
+                first=0,  # Check at startup too; notified_releases keeps restarts from re-sending
+                name="notify_releases",
+            )
         app.add_handler(CommandHandler("start", start))
         app.add_handler(CommandHandler("chatid", chatid))
+        app.add_handler(CommandHandler("clearcache", clearcache))
         app.add_handler(CommandHandler("movies", movies))
         app.add_handler(CommandHandler("series", series))
         app.add_handler(CommandHandler("help", help_command))
@@ -1038,7 +1329,6 @@ try:
         print("Bot is running. Press Ctrl+C to stop.")
         app.run_polling()
 except Exception as e:
-    import traceback
     print('Startup error:', e, file=sys.stderr)
     traceback.print_exc()
     raise
\ No newline at end of file
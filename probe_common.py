@@ -0,0 +1,28 @@
+import asyncio
+import logging
+import random
+import ssl
+
+try:
+    import uvloop
+except ImportError:  # Optional; not available on Windows
+    uvloop = None
+
+# Shared by the connectivity probe scripts
+SSL_CONTEXT = ssl.create_default_context()  # Built once so the CA bundle is loaded a single time
+
+RETRY_ATTEMPTS = 5
+
+def backoff_delay(attempt):
+    """Exponential backoff with up to 50% jitter, capped at 30 seconds."""
+    return min(30, (2 ** attempt) * (1 + random.random() * 0.5))
+
+def configure_logging():
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+
+def run(main):
+    """Run a coroutine on uvloop when it is installed, else on the default asyncio loop."""
+    return (uvloop.run if uvloop is not None else asyncio.run)(main)
@@ -1,15 +1,43 @@
-import aiohttp
 import asyncio
+import logging
+import ssl
+
+from probe_common import RETRY_ATTEMPTS, SSL_CONTEXT, backoff_delay, configure_logging, run
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_HOST = "www.google.com"
+PROBE_TIMEOUT = 10  # Seconds for connect + TLS handshake
+CLOSE_TIMEOUT = 2  # Seconds to wait for the TLS shutdown before giving up on it
 
 async def test_google():
-    url = "https://www.google.com"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as resp:
-                print(f"Status: {resp.status}")
-                print("Google reachable!")
-    except Exception as e:
-        print(f"Error: {e}")
+    # A completed TLS handshake proves reachability; no HTTP client (or its import cost) needed
+    last_error = None
+    for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(backoff_delay(attempt - 1))
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(GOOGLE_HOST, 443, ssl=SSL_CONTEXT),
+                PROBE_TIMEOUT,
+            )
+        except ssl.SSLError as e:
+            logger.error("Error: %s", e)
+            return
+        except (OSError, asyncio.TimeoutError) as e:
+            # DNS failures, refused/reset connections and timeouts are worth another try
+            last_error = e
+            continue
+        logger.info("Google reachable!")
+        # The handshake already proved reachability; a slow or failed TLS shutdown doesn't change that
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), CLOSE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        return
+    logger.error("Error: %s", last_error)
 
 if __name__ == "__main__":
-    asyncio.run(test_google())
+    configure_logging()
+    run(test_google())
@@ -1,20 +1,133 @@
 import aiohttp
 import asyncio
+import logging
+import orjson
 import os
+import time
 
-async def test_telegram_api():
-    token = os.environ.get("TELEGRAM_BOT_TOKEN")
-    if not token:
-        print("Error: TELEGRAM_BOT_TOKEN environment variable not set.")
-        return
-    url = f"https://api.telegram.org/bot{token}/getMe"
+from probe_common import RETRY_ATTEMPTS, SSL_CONTEXT, backoff_delay, configure_logging, run
+
+logger = logging.getLogger(__name__)
+
+_SESSION = None
+_SESSION_LOCK = asyncio.Lock()
+
+if os.supports_bytes_environ:
+    # Bot tokens are ASCII, so skip the locale-aware decode of os.environ
+    _token = os.environb.get(b"TELEGRAM_BOT_TOKEN")
+    TELEGRAM_BOT_TOKEN = _token.decode("ascii", errors="replace") if _token else None
+else:  # Windows has no bytes environment
+    TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
+GET_ME_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe" if TELEGRAM_BOT_TOKEN else None
+MAX_BODY_BYTES = 4096
+RESULT_TTL = 30  # Seconds a successful getMe result is reused before probing again
+_last_result = None  # (time.monotonic() of the probe, status, logged summary)
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_connect=3, sock_read=7)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Transient failures worth another try; anything else (bad token, TLS errors, ...) fails fast
+# (ClientOSError covers DNS/connect failures and resets; TLS errors subclass it and are caught first)
+RETRY_ERRORS = (aiohttp.ClientOSError, aiohttp.ServerDisconnectedError, asyncio.TimeoutError)
+
+def make_resolver():
+    """Use the c-ares resolver (aiodns, pinned in requirements.txt); fall back to threaded getaddrinfo without it."""
+    try:
+        return aiohttp.AsyncResolver()
+    except RuntimeError:
+        return aiohttp.ThreadedResolver()
+
+def make_connector():
+    # Long keepalive so probes run on a slow cadence still find a warm socket in the pool
+    return aiohttp.TCPConnector(
+        resolver=make_resolver(),
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+        ssl=SSL_CONTEXT,
+        limit=32,
+        limit_per_host=8,
+        keepalive_timeout=120,
+        enable_cleanup_closed=True,
+    )
+
+async def get_session():
+    """Return the shared session, creating it on first use so repeat probes reuse its connections."""
+    global _SESSION
+    async with _SESSION_LOCK:
+        if _SESSION is None or _SESSION.closed:
+            _SESSION = aiohttp.ClientSession(connector=make_connector())
+        return _SESSION
+
+async def close_session():
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+async def read_bounded(stream, limit):
+    """Read a response body until EOF or `limit` bytes, whichever comes first."""
+    body = bytearray()
+    while len(body) < limit:
+        chunk = await stream.read(limit - len(body))
+        if not chunk:
+            break
+        body += chunk
+    return bytes(body)
+
+def describe_get_me(body):
+    """Summarise a getMe reply, or return None when the body isn't JSON (e.g. a proxy error page)."""
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if data.get("ok"):
+        return f"Bot: @{data.get('result', {}).get('username')}"
+    return f"Telegram error: {data.get('description')}"
+
+async def test_telegram_api(session=None):
+    """Probe getMe and return the HTTP status, or None on failure. Successes are reused for RESULT_TTL seconds."""
+    global _last_result
+    if GET_ME_URL is None:
+        logger.error("TELEGRAM_BOT_TOKEN environment variable not set.")
+        return None
+    if _last_result is not None and time.monotonic() - _last_result[0] < RESULT_TTL:
+        _, status, summary = _last_result
+        logger.info("Status: %s (cached) %s", status, summary)
+        return status
+    if session is None:
+        session = await get_session()
+    last_error = None
+    for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(backoff_delay(attempt - 1))
+        try:
+            async with session.get(GET_ME_URL, timeout=PROBE_TIMEOUT) as resp:
+                if resp.status in RETRY_STATUSES and attempt < RETRY_ATTEMPTS - 1:
+                    continue
+                # getMe replies are tiny; cap the read so an error page can't balloon memory
+                body = await read_bounded(resp.content, MAX_BODY_BYTES)
+                summary = describe_get_me(body) or body.decode("utf-8", errors="replace")
+                logger.info("Status: %s %s", resp.status, summary)
+                if resp.status == 200:
+                    _last_result = (time.monotonic(), resp.status, summary)
+                return resp.status
+        except aiohttp.ClientSSLError as e:
+            logger.error("Error: %s", e)
+            return None
+        except RETRY_ERRORS as e:
+            last_error = e
+        except Exception as e:
+            logger.error("Error: %s", e)
+            return None
+    logger.error("Error: %s", last_error)
+    return None
+
+async def main():
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as resp:
-                print(f"Status: {resp.status}")
-                print(await resp.text())
-    except Exception as e:
-        print(f"Error: {e}")
+        await test_telegram_api()
+    finally:
+        await close_session()
 
 if __name__ == "__main__":
-    asyncio.run(test_telegram_api())
+    configure_logging()
+    run(main())